@@ -0,0 +1,558 @@
+"""
+Backends de armazenamento do catálogo de livros usados pela API.
+
+O backend é escolhido pela variável de ambiente BOOKS_BACKEND:
+- "csv" (padrão): lê o CSV gerado no scraping a cada consulta.
+- "sqlite": usa um banco SQLite indexado (categoria, preço, rating e FTS5
+  para títulos), montado a partir do CSV na primeira execução e reconstruído
+  na inicialização sempre que o CSV de origem mudar (tamanho ou data).
+
+Para (re)construir o banco manualmente:
+python api/armazenamento.py data/livros_completo.csv data/livros.db
+"""
+
+import os
+import csv
+import logging
+import queue
+import sqlite3
+import sys
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from collections import Counter
+from contextlib import contextmanager
+
+CAMPOS_LIVRO = ['Título', 'Categoria', 'Preço', 'Rating', 'Disponibilidade', 'Imagem']
+MAPEAMENTO_RATING = {"one": 1, "two": 2, "three": 3, "four": 4, "five": 5}
+
+logger = logging.getLogger(__name__)
+
+
+def processar_preco_csv(preco_str):
+    """
+    Processa preço do CSV.
+    """
+    try:
+        preco_str = str(preco_str).strip()
+        preco_limpo = ''.join(c for c in preco_str if c.isdigit())
+        if not preco_limpo:
+            return 0.0
+        return float(preco_limpo) / 100
+    except (ValueError, AttributeError):
+        return 0.0
+
+
+def converter_rating(rating):
+    """
+    Converte o rating do CSV ("Three", "3"...) para número. Desconhecido vira 0.
+    """
+    r = str(rating).strip()
+    if r.isdigit():
+        return int(r)
+    return MAPEAMENTO_RATING.get(r.lower(), 0)
+
+
+def ler_csv(caminho_csv):
+    """
+    Percorre o CSV linha a linha, devolvendo um dicionário por livro.
+    """
+    with open(caminho_csv, encoding='utf-8-sig') as f:
+        reader = csv.DictReader(f, delimiter=';')
+        for row in reader:
+            yield {k.strip(): v for k, v in row.items()}
+
+
+class BackendLivros(ABC):
+    """
+    Interface dos backends de livros.
+    As implementações padrão trabalham em memória sobre carregar_livros();
+    backends mais escaláveis sobrescrevem os métodos para filtrar na origem.
+    A API consulta sempre pela sessao(), aberta uma vez por requisição.
+    """
+
+    @contextmanager
+    def sessao(self):
+        yield self
+
+    @abstractmethod
+    def carregar_livros(self):
+        """
+        Devolve todos os livros, um dicionário por livro, na ordem do CSV.
+        """
+
+    def obter_livro(self, indice):
+        livros = self.carregar_livros()
+        if 0 <= indice < len(livros):
+            return livros[indice]
+        return None
+
+    def contar_livros(self):
+        return len(self.carregar_livros())
+
+    def listar_categorias(self):
+        return sorted(set(livro["Categoria"] for livro in self.carregar_livros()))
+
+    def buscar_livros(self, titulo=None, categoria=None):
+        busca_titulo = titulo.lower().strip() if titulo else None
+        busca_categoria = categoria.lower().strip() if categoria else None
+        resultados = []
+        for livro in self.carregar_livros():
+            livro_titulo = livro.get("Título", "").strip().lower()
+            livro_categoria = livro.get("Categoria", "").strip().lower()
+            cond_titulo = (busca_titulo in livro_titulo) if busca_titulo else True
+            cond_categoria = (livro_categoria == busca_categoria) if busca_categoria else True
+            if cond_titulo and cond_categoria:
+                resultados.append(livro)
+        return resultados
+
+    def livros_por_faixa_de_preco(self, preco_min, preco_max):
+        return [
+            livro for livro in self.carregar_livros()
+            if preco_min <= processar_preco_csv(livro.get("Preço", "0")) <= preco_max
+        ]
+
+    def livros_top_rated(self):
+        livros = self.carregar_livros()
+        if not livros:
+            return []
+        ratings = [converter_rating(livro.get("Rating", "0")) for livro in livros]
+        max_rating = max(ratings)
+        return [livro for livro, r in zip(livros, ratings) if r == max_rating]
+
+    def estatisticas_gerais(self):
+        livros = self.carregar_livros()
+        precos = [processar_preco_csv(livro.get("Preço", "0")) for livro in livros if livro.get("Preço")]
+        ratings = [livro.get("Rating", "Unknown") for livro in livros]
+        return {
+            "total_livros": len(livros),
+            "preco_medio": round(sum(precos) / len(precos), 2) if precos else 0,
+            "distribuicao_ratings": dict(Counter(ratings))
+        }
+
+    def estatisticas_categorias(self):
+        stats = {}
+        for livro in self.carregar_livros():
+            cat = livro.get("Categoria", "")
+            if not cat:
+                continue
+            if cat not in stats:
+                stats[cat] = {"qtd": 0, "soma_precos": 0.0}
+            stats[cat]["qtd"] += 1
+            stats[cat]["soma_precos"] += processar_preco_csv(livro.get("Preço", "0"))
+        result = []
+        for cat, v in stats.items():
+            media = round(v["soma_precos"] / v["qtd"], 2) if v["qtd"] else 0
+            result.append({"categoria": cat, "qtd_livros": v["qtd"], "preco_medio": media})
+        return sorted(result, key=lambda x: x["categoria"])
+
+    def fechar(self):
+        pass
+
+
+class BackendCSV(BackendLivros):
+    """
+    Backend original: lê o CSV inteiro a cada consulta.
+    """
+
+    def __init__(self, caminho_csv):
+        self.caminho_csv = caminho_csv
+
+    def carregar_livros(self):
+        return list(ler_csv(self.caminho_csv))
+
+
+class PoolEsgotado(Exception):
+    """
+    Nenhuma conexão do pool ficou livre dentro do tempo limite.
+    """
+
+
+class PoolConexoes:
+    """
+    Pool simples de conexões SQLite. Cada requisição pega uma conexão
+    (ver BackendSQLite.sessao), usa durante o handler e devolve ao final.
+    """
+
+    def __init__(self, caminho_db, tamanho=8, timeout=30):
+        self.caminho_db = caminho_db
+        self.tamanho = tamanho
+        self.timeout = timeout
+        self._livres = queue.LifoQueue()
+        self._criadas = 0
+        self._fechado = False
+        self._lock = threading.Lock()
+
+    def _nova_conexao(self):
+        con = sqlite3.connect(self.caminho_db, check_same_thread=False)
+        try:
+            con.row_factory = sqlite3.Row
+            con.execute("PRAGMA query_only = ON")
+        except sqlite3.Error:
+            con.close()
+            raise
+        return con
+
+    def _pegar(self):
+        if self._fechado:
+            raise RuntimeError("Pool de conexões fechado")
+        try:
+            return self._livres.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            criar = self._criadas < self.tamanho
+            if criar:
+                self._criadas += 1
+        if criar:
+            try:
+                return self._nova_conexao()
+            except Exception:
+                with self._lock:
+                    self._criadas -= 1
+                raise
+        try:
+            return self._livres.get(timeout=self.timeout)
+        except queue.Empty:
+            raise PoolEsgotado(f"Nenhuma conexão livre após {self.timeout}s")
+
+    def _devolver(self, con):
+        with self._lock:
+            if not self._fechado:
+                self._livres.put(con)
+                return
+            self._criadas -= 1
+        con.close()
+
+    @contextmanager
+    def conexao(self):
+        con = self._pegar()
+        try:
+            yield con
+        finally:
+            self._devolver(con)
+
+    def fechar(self):
+        """
+        Fecha as conexões livres; as que estão em uso são fechadas ao serem devolvidas.
+        """
+        with self._lock:
+            self._fechado = True
+            while True:
+                try:
+                    self._livres.get_nowait().close()
+                except queue.Empty:
+                    break
+                self._criadas -= 1
+
+
+SQL_SCHEMA = """
+CREATE TABLE livros (
+    id INTEGER PRIMARY KEY,
+    titulo TEXT NOT NULL,
+    titulo_busca TEXT NOT NULL,
+    categoria TEXT NOT NULL,
+    categoria_busca TEXT NOT NULL,
+    preco_texto TEXT NOT NULL,
+    preco REAL NOT NULL,
+    rating TEXT NOT NULL,
+    rating_num INTEGER NOT NULL,
+    disponibilidade TEXT NOT NULL,
+    imagem TEXT NOT NULL
+);
+CREATE INDEX idx_livros_categoria ON livros (categoria_busca);
+CREATE INDEX idx_livros_preco ON livros (preco);
+CREATE INDEX idx_livros_rating ON livros (rating_num);
+CREATE VIRTUAL TABLE livros_fts USING fts5 (
+    titulo_busca, content='livros', content_rowid='id', tokenize='trigram case_sensitive 1'
+);
+CREATE TABLE meta (
+    chave TEXT PRIMARY KEY,
+    valor TEXT NOT NULL
+);
+"""
+
+# muda quando o SQL_SCHEMA muda, para forçar a reconstrução de bancos antigos
+VERSAO_SCHEMA = "2"
+
+COLUNAS_SELECT = (
+    'titulo AS "Título", categoria AS "Categoria", preco_texto AS "Preço", '
+    'rating AS "Rating", disponibilidade AS "Disponibilidade", imagem AS "Imagem"'
+)
+
+
+def assinatura_csv(caminho_csv):
+    """
+    Identifica a versão do CSV pelo tamanho e data de modificação.
+    """
+    info = os.stat(caminho_csv)
+    return {"csv_mtime_ns": str(info.st_mtime_ns), "csv_tamanho": str(info.st_size)}
+
+
+def construir_banco_sqlite(caminho_csv, caminho_db, lote=10000):
+    """
+    Monta o banco SQLite a partir do CSV, em lotes, sem carregar tudo na memória.
+    O id de cada livro é a posição no CSV (começando em 1).
+    O banco é gerado num arquivo temporário único e só depois substitui o atual.
+    """
+    caminho_csv = os.path.abspath(caminho_csv)
+    meta = {"versao_schema": VERSAO_SCHEMA, "csv_origem": caminho_csv, **assinatura_csv(caminho_csv)}
+    pasta_db = os.path.dirname(os.path.abspath(caminho_db))
+    fd, temporario = tempfile.mkstemp(
+        prefix=os.path.basename(caminho_db) + ".", suffix=".tmp", dir=pasta_db
+    )
+    os.close(fd)
+    try:
+        con = sqlite3.connect(temporario)
+        try:
+            con.executescript(SQL_SCHEMA)
+            linhas = []
+            for livro in ler_csv(caminho_csv):
+                titulo = livro.get("Título") or ""
+                categoria = livro.get("Categoria") or ""
+                preco_texto = livro.get("Preço") or ""
+                rating = livro.get("Rating") or ""
+                # colunas de busca normalizadas em Python, como no backend CSV
+                # (o lower() e o NOCASE do SQLite só tratam ASCII)
+                linhas.append((
+                    titulo,
+                    titulo.strip().lower(),
+                    categoria,
+                    categoria.strip().lower(),
+                    preco_texto,
+                    processar_preco_csv(preco_texto),
+                    rating,
+                    converter_rating(rating),
+                    livro.get("Disponibilidade") or "",
+                    livro.get("Imagem") or "",
+                ))
+                if len(linhas) >= lote:
+                    _inserir_lote(con, linhas)
+                    linhas = []
+            if linhas:
+                _inserir_lote(con, linhas)
+            con.execute("INSERT INTO livros_fts (livros_fts) VALUES ('rebuild')")
+            con.executemany("INSERT INTO meta (chave, valor) VALUES (?, ?)", meta.items())
+            con.execute("ANALYZE")
+            con.commit()
+        finally:
+            con.close()
+        os.replace(temporario, caminho_db)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+
+
+def _inserir_lote(con, linhas):
+    con.executemany(
+        "INSERT INTO livros (titulo, titulo_busca, categoria, categoria_busca, preco_texto, preco, "
+        "rating, rating_num, disponibilidade, imagem) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        linhas
+    )
+
+
+def _ler_meta(caminho_db):
+    con = sqlite3.connect(f"file:{caminho_db}?mode=ro", uri=True)
+    try:
+        return dict(con.execute("SELECT chave, valor FROM meta").fetchall())
+    except sqlite3.Error:
+        return {}
+    finally:
+        con.close()
+
+
+def _csv_para_reconstruir(caminho_db, caminho_csv):
+    """
+    Devolve o CSV a partir do qual o banco precisa ser (re)construído,
+    ou None se o banco estiver em dia com o CSV de origem.
+    """
+    if not os.path.exists(caminho_db):
+        if not caminho_csv:
+            raise FileNotFoundError(caminho_db)
+        return caminho_csv
+    meta = _ler_meta(caminho_db)
+    origem = meta.get("csv_origem")
+    if meta.get("versao_schema") != VERSAO_SCHEMA:
+        # banco gerado por uma versão antiga: reconstrói da origem, se ainda existir
+        if origem and os.path.exists(origem):
+            return origem
+        if caminho_csv:
+            return caminho_csv
+        raise RuntimeError(f"{caminho_db} está num formato antigo e o CSV de origem não foi encontrado")
+    if not os.path.exists(origem):
+        return None
+    if any(meta.get(k) != v for k, v in assinatura_csv(origem).items()):
+        return origem
+    return None
+
+
+@contextmanager
+def _trava_arquivo(caminho):
+    """
+    Trava exclusiva entre processos (ex.: vários workers do uvicorn subindo juntos).
+    """
+    with open(caminho, "a+b") as f:
+        if os.name == "nt":
+            import msvcrt
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def atualizar_banco_sqlite(caminho_db, caminho_csv=None):
+    """
+    Constrói o banco se ele não existir ou se o CSV de origem mudou.
+    Só um processo reconstrói por vez; os demais esperam e reaproveitam o resultado.
+    """
+    if _csv_para_reconstruir(caminho_db, caminho_csv) is None:
+        return
+    with _trava_arquivo(caminho_db + ".lock"):
+        origem = _csv_para_reconstruir(caminho_db, caminho_csv)
+        if origem is None:
+            return
+        if os.path.exists(caminho_db):
+            logger.warning(f"{caminho_db} desatualizado em relação a {origem}; reconstruindo o banco")
+        construir_banco_sqlite(origem, caminho_db)
+
+
+class ConsultasSQLite(BackendLivros):
+    """
+    Consultas ao banco SQLite sobre uma única conexão (a da requisição atual).
+    Os filtros viram consultas indexadas em vez de varrer o CSV.
+    """
+
+    def __init__(self, con):
+        self.con = con
+
+    def _consultar(self, sql, parametros=()):
+        return self.con.execute(sql, parametros).fetchall()
+
+    def _livros(self, where="", parametros=()):
+        sql = f"SELECT {COLUNAS_SELECT} FROM livros {where} ORDER BY id"
+        return [dict(row) for row in self._consultar(sql, parametros)]
+
+    def carregar_livros(self):
+        return self._livros()
+
+    def obter_livro(self, indice):
+        livros = self._livros("WHERE id = ?", (indice + 1,))
+        return livros[0] if livros else None
+
+    def contar_livros(self):
+        return self._consultar("SELECT COUNT(*) FROM livros")[0][0]
+
+    def listar_categorias(self):
+        rows = self._consultar("SELECT DISTINCT categoria FROM livros ORDER BY categoria")
+        return [row[0] for row in rows]
+
+    def buscar_livros(self, titulo=None, categoria=None):
+        condicoes = []
+        parametros = []
+        busca_titulo = titulo.lower().strip() if titulo else ""
+        busca_categoria = categoria.lower().strip() if categoria else ""
+        if len(busca_titulo) >= 3:
+            # o tokenizer trigram só indexa termos com 3 ou mais caracteres
+            condicoes.append("id IN (SELECT rowid FROM livros_fts WHERE livros_fts MATCH ?)")
+            parametros.append('"' + busca_titulo.replace('"', '""') + '"')
+        elif busca_titulo:
+            condicoes.append("instr(titulo_busca, ?) > 0")
+            parametros.append(busca_titulo)
+        if busca_categoria:
+            condicoes.append("categoria_busca = ?")
+            parametros.append(busca_categoria)
+        where = "WHERE " + " AND ".join(condicoes) if condicoes else ""
+        return self._livros(where, parametros)
+
+    def livros_por_faixa_de_preco(self, preco_min, preco_max):
+        return self._livros("WHERE preco BETWEEN ? AND ?", (preco_min, preco_max))
+
+    def livros_top_rated(self):
+        return self._livros("WHERE rating_num = (SELECT MAX(rating_num) FROM livros)")
+
+    def estatisticas_gerais(self):
+        total, media = self._consultar(
+            "SELECT COUNT(*), AVG(CASE WHEN preco_texto != '' THEN preco END) FROM livros"
+        )[0]
+        rows = self._consultar("SELECT rating, COUNT(*) FROM livros GROUP BY rating ORDER BY MIN(id)")
+        return {
+            "total_livros": total,
+            "preco_medio": round(media, 2) if media is not None else 0,
+            "distribuicao_ratings": {row[0]: row[1] for row in rows}
+        }
+
+    def estatisticas_categorias(self):
+        rows = self._consultar(
+            "SELECT categoria, COUNT(*), AVG(preco) FROM livros "
+            "WHERE categoria != '' GROUP BY categoria ORDER BY categoria"
+        )
+        return [
+            {"categoria": row[0], "qtd_livros": row[1], "preco_medio": round(row[2], 2)}
+            for row in rows
+        ]
+
+
+class BackendSQLite(BackendLivros):
+    """
+    Backend SQLite. As consultas são feitas pela sessão da requisição
+    (sessao()), que segura uma conexão do pool até o fim do handler.
+    """
+
+    def __init__(self, caminho_db, caminho_csv=None, tamanho_pool=8, timeout_pool=30):
+        atualizar_banco_sqlite(caminho_db, caminho_csv)
+        self.caminho_db = caminho_db
+        self.pool = PoolConexoes(caminho_db, tamanho_pool, timeout_pool)
+
+    @contextmanager
+    def sessao(self):
+        with self.pool.conexao() as con:
+            yield ConsultasSQLite(con)
+
+    def carregar_livros(self):
+        with self.sessao() as consultas:
+            return consultas.carregar_livros()
+
+    def fechar(self):
+        self.pool.fechar()
+
+
+def criar_backend(caminho_csv):
+    """
+    Instancia o backend configurado em BOOKS_BACKEND ("csv" ou "sqlite").
+    """
+    tipo = os.getenv("BOOKS_BACKEND", "csv").strip().lower()
+    if tipo == "sqlite":
+        caminho_db = os.getenv(
+            "BOOKS_DB_PATH",
+            os.path.join(os.path.dirname(caminho_csv), 'livros.db')
+        )
+        tamanho_pool = int(os.getenv("BOOKS_DB_POOL_SIZE", "8"))
+        timeout_pool = float(os.getenv("BOOKS_DB_POOL_TIMEOUT", "30"))
+        return BackendSQLite(caminho_db, caminho_csv, tamanho_pool, timeout_pool)
+    if tipo == "csv":
+        return BackendCSV(caminho_csv)
+    raise ValueError(f"BOOKS_BACKEND inválido: {tipo}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Uso: python api/armazenamento.py <arquivo.csv> <arquivo.db>")
+        sys.exit(1)
+    construir_banco_sqlite(sys.argv[1], sys.argv[2])
+    print(f"Banco SQLite gerado em {sys.argv[2]}")
@@ -1,14 +1,14 @@
 """
 API RESTful de livros - Tech Challenge FIAP
-Implementada em FastAPI, alimentada pelo CSV gerado no scraping.
+Implementada em FastAPI, alimentada pelo CSV gerado no scraping
+(ou por um banco SQLite indexado, ver armazenamento.py).
 """
 
 import os
-import csv
 import logging
 import time
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
-from collections import Counter
 from fastapi import FastAPI, HTTPException, Query, Depends, Request, Path, Form, Header, Response
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm, HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.responses import RedirectResponse
@@ -18,18 +18,11 @@ from pydantic import BaseModel
 from unidecode import unidecode
 from pythonjsonlogger import jsonlogger 
 
-def processar_preco_csv(preco_str):
-    """
-    Processa preço do CSV.
-    """
-    try:
-        preco_str = str(preco_str).strip()
-        preco_limpo = ''.join(c for c in preco_str if c.isdigit())
-        if not preco_limpo:
-            return 0.0
-        return float(preco_limpo) / 100
-    except (ValueError, AttributeError):
-        return 0.0
+try:
+    from .armazenamento import BackendLivros, PoolEsgotado, criar_backend, processar_preco_csv
+except ImportError:
+    # executado de dentro de api/ (uvicorn main:app / python api/main.py)
+    from armazenamento import BackendLivros, PoolEsgotado, criar_backend, processar_preco_csv
 
 
 class LivroFeatures(BaseModel):
@@ -54,12 +47,24 @@ fileHandler = logging.FileHandler("logs_api.json")
 fileHandler.setFormatter(formatter)  
 logger.addHandler(fileHandler)
 
+CSV_PATH = os.path.join(os.path.dirname(__file__), '../data/livros_completo.csv')
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Cria o backend de dados na subida da API (no SQLite, monta/atualiza o banco)
+    e fecha o pool de conexões no desligamento.
+    """
+    app.state.backend = criar_backend(CSV_PATH)
+    yield
+    app.state.backend.fechar()
 
 app = FastAPI(
     title="Tech Challenge FIAP - Books API",
     description="API para recomendação e gerenciamento de livros",
     version="1.0",
-    swagger_ui_parameters={"docExpansion": "list"}
+    swagger_ui_parameters={"docExpansion": "list"},
+    lifespan=lifespan
 )
 
 security = HTTPBearer()
@@ -171,32 +176,29 @@ def trigger_scraping(
         raise HTTPException(status_code=403, detail="Sem permissão")
     return {"status": "Scraping de livros disparado!"}
 
-CSV_PATH = os.path.join(os.path.dirname(__file__), '../data/livros_completo.csv')
-
-def carregar_livros():
+def sessao_catalogo(request: Request):
     """
-    Lê os dados do CSV e devolve uma lista de dicionários, um por livro.
+    Abre uma sessão do backend por requisição (no SQLite, uma conexão do pool)
+    e a devolve quando o handler termina.
     """
-    livros = []
-    with open(CSV_PATH, encoding='utf-8-sig') as f:
-        reader = csv.DictReader(f, delimiter=';')
-        for row in reader:
-            row = {k.strip(): v for k, v in row.items()}
-            livros.append(row)
-    return livros
+    try:
+        with request.app.state.backend.sessao() as catalogo:
+            yield catalogo
+    except PoolEsgotado:
+        raise HTTPException(status_code=503, detail="Banco de dados ocupado, tente novamente")
 
 @app.get(
     "/api/v1/books",
     summary="Lista todos os livros disponíveis",
     description="Retorna uma lista completa de todos os livros cadastrados na base de dados (extraídos do arquivo CSV)."
 )
-def listar_livros(request: Request):
+def listar_livros(request: Request, catalogo: BackendLivros = Depends(sessao_catalogo)):
     """
     Endpoint que retorna todos os livros cadastrados no sistema.
     Ideal para listagens completas e integração com visualização de catálogo.
     """
     logger.info(f"GET /api/v1/books chamado por IP: {request.client.host}")
-    return carregar_livros()
+    return catalogo.carregar_livros()
 
 @app.get(
     "/api/v1/books/{id:int}",
@@ -205,16 +207,17 @@ def listar_livros(request: Request):
 )
 def detalhe_livro(
     id: int = Path(..., description="Índice do livro na lista (0 é o primeiro livro)"),
-    request: Request = None
+    request: Request = None,
+    catalogo: BackendLivros = Depends(sessao_catalogo)
 ):
     logger.info(f"GET /api/v1/books/{id} chamado por IP: {request.client.host}")
     """
     Procura e retorna um livro pelo índice da lista (0 = primeiro livro).
     Se não achar, retorna um erro 404.
     """
-    livros = carregar_livros()
-    if 0 <= id < len(livros):
-        return livros[id]
+    livro = catalogo.obter_livro(id)
+    if livro is not None:
+        return livro
     raise HTTPException(status_code=404, detail="Livro não encontrado")
 
 @app.get(
@@ -231,29 +234,14 @@ def buscar_livros(
         None, 
         description="Nome exato da categoria desejada, conforme está no registro. Exemplo: 'Fiction', 'Poetry', etc."
     ),
-    request: Request = None
+    request: Request = None,
+    catalogo: BackendLivros = Depends(sessao_catalogo)
 ):
     """
     Filtra livros pelo título e categoria, com tratamento de erro para campos faltantes.
     """
     logger.info(f"GET /api/v1/books/search chamado por IP: {request.client.host if request else 'indefinido'}")
-    livros = carregar_livros()
-    resultados = []
-    busca_title = title.lower().strip() if title else None
-    busca_category = category.lower().strip() if category else None
-
-    for livro in livros:
-        livro_titulo = ""
-        livro_categoria = ""
-        for k in livro.keys():
-            if k.strip().lower().replace("ã", "a").replace("í", "i").replace("ú", "u").replace("â", "a").replace("ô", "o").replace("é", "e").replace("ê", "e") == "titulo":
-                livro_titulo = livro[k].strip().lower()
-            if k.strip().lower().replace("ã", "a") == "categoria":
-                livro_categoria = livro[k].strip().lower()
-        cond_titulo = (busca_title in livro_titulo) if busca_title else True
-        cond_categoria = (livro_categoria == busca_category) if busca_category else True
-        if cond_titulo and cond_categoria:
-            resultados.append(livro)
+    resultados = catalogo.buscar_livros(title, category)
     if not resultados:
         raise HTTPException(
             status_code=404,
@@ -266,15 +254,13 @@ def buscar_livros(
     summary="Lista todas as categorias únicas",
     description="Retorna uma lista com todas as categorias encontradas nos livros, sem repetições."
 )
-def listar_categorias(request: Request):
+def listar_categorias(request: Request, catalogo: BackendLivros = Depends(sessao_catalogo)):
     """
     Endpoint que extrai e retorna todas as categorias únicas presentes no dataset de livros.
     Recomendada para gerar filtros dinâmicos e apoiar análises estatísticas.
     """
     logger.info(f"GET /api/v1/categories chamado por IP: {request.client.host}")
-    livros = carregar_livros()
-    categorias = sorted(set(livro["Categoria"] for livro in livros))
-    return categorias
+    return catalogo.listar_categorias()
 
 @app.get(
     "/api/v1/health",
@@ -283,15 +269,14 @@ def listar_categorias(request: Request):
         "Endpoint de verificação que testa se a API está executando corretamente. "
     )
 )
-def health_check(request: Request):
+def health_check(request: Request, catalogo: BackendLivros = Depends(sessao_catalogo)):
     """
     Verifica a disponibilidade da API e do arquivo de dados.
     Retorna status e quantidade de registros para monitoramento automatizado.
     """
     logger.info(f"GET /api/v1/health chamado por IP: {request.client.host}")
     try:
-        livros = carregar_livros()
-        return {"status": "ok", "qtd_livros": len(livros)}
+        return {"status": "ok", "qtd_livros": catalogo.contar_livros()}
     except Exception:
         raise HTTPException(status_code=500, detail="Erro nos dados ou na API")
 
@@ -302,23 +287,13 @@ def health_check(request: Request):
         "Retorna estatísticas da base de livros: Total de registros, preço médio e distribuição das avaliações (ratings). "     
     )
 )
-def stats_overview(request: Request):
+def stats_overview(request: Request, catalogo: BackendLivros = Depends(sessao_catalogo)):
     """
     Endpoint para obter métricas agregadas dos livros.
     Retorna total de itens, preço médio e a distribuição dos ratings.
     """
     logger.info(f"GET /api/v1/stats/overview chamado por IP: {request.client.host}")
-    livros = carregar_livros()
-    total = len(livros)
-    precos = [processar_preco_csv(livro.get("Preço", "0")) for livro in livros if livro.get("Preço")]
-    ratings = [livro.get("Rating", "Unknown") for livro in livros]
-    media_preco = round(sum(precos) / len(precos), 2) if precos else 0
-    dist_ratings = dict(Counter(ratings))
-    return {
-        "total_livros": total,
-        "preco_medio": media_preco,
-        "distribuicao_ratings": dist_ratings
-    }
+    return catalogo.estatisticas_gerais()
 
 @app.get(
     "/api/v1/stats/categories",
@@ -327,31 +302,13 @@ def stats_overview(request: Request):
         "Retorna, para cada categoria de livro encontrada, a quantidade de títulos e o preço médio associado. "
     )
 )
-def stats_categorias(request: Request):
+def stats_categorias(request: Request, catalogo: BackendLivros = Depends(sessao_catalogo)):
     """
     Endpoint para obter estatísticas segmentadas por categoria.
     Devolve lista com nome da categoria, total de livros e preço médio por grupo.
     """
     logger.info(f"GET /api/v1/stats/categories chamado por IP: {request.client.host}")
-    livros = carregar_livros()
-    stats = {}
-    for livro in livros:
-        cat = ""
-        for k in livro.keys():
-            if k.strip().lower().replace("ã", "a") == "categoria":
-                cat = livro[k]
-        preco = processar_preco_csv(livro.get("Preço", "0"))
-        if not cat:
-            continue
-        if cat not in stats:
-            stats[cat] = {"qtd": 0, "soma_precos": 0.0}
-        stats[cat]["qtd"] += 1
-        stats[cat]["soma_precos"] += preco
-    result = []
-    for cat, v in stats.items():
-        media = round(v["soma_precos"]/v["qtd"], 2) if v["qtd"] else 0
-        result.append({"categoria": cat, "qtd_livros": v["qtd"], "preco_medio": media})
-    return sorted(result, key=lambda x: x["categoria"])
+    return catalogo.estatisticas_categorias()
 
 @app.get(
     "/api/v1/books/top-rated",
@@ -360,36 +317,13 @@ def stats_categorias(request: Request):
         "Retorna todos os livros com o maior rating existente na base de dados. "
     )
 )
-def livros_top_rated(request: Request):
+def livros_top_rated(request: Request, catalogo: BackendLivros = Depends(sessao_catalogo)):
     """
     Endpoint para listar todos os livros com a nota máxima. 
     Retorna uma lista detalhada dos livros top de rating do dataset.
     """
     logger.info(f"GET /api/v1/books/top-rated chamado por IP: {request.client.host}")
-    livros = carregar_livros()
-    ratings_convertidos = []
-    for livro in livros:
-        r = livro.get("Rating", "0")
-        try:
-            mapeamento = {"one": 1, "two": 2, "three": 3, "four": 4, "five": 5}
-            if r.strip().isdigit():
-                rating_num = int(r)
-            else:
-                rating_num = mapeamento.get(r.lower(), 0)
-            ratings_convertidos.append(rating_num)
-        except:
-            ratings_convertidos.append(0)
-    if not ratings_convertidos:
-        return []
-    max_rating = max(ratings_convertidos)
-    resultado = []
-    for i, livro in enumerate(livros):
-        r = livro.get("Rating", "0")
-        mapeamento = {"one": 1, "two": 2, "three": 3, "four": 4, "five": 5}
-        rating_num = mapeamento.get(str(r).lower(), 0) if not str(r).isdigit() else int(r)
-        if rating_num == max_rating:
-            resultado.append(livro)
-    return resultado
+    return catalogo.livros_top_rated()
 
 @app.get(
     "/api/v1/books/price-range",
@@ -399,20 +333,14 @@ def livros_top_rated(request: Request):
 def livros_por_faixa_de_preco(
     min: float = Query(..., description="Preço mínimo"),
     max: float = Query(..., description="Preço máximo"),
-    request: Request = None
+    request: Request = None,
+    catalogo: BackendLivros = Depends(sessao_catalogo)
 ):
     """
     Filtra livros cujo preço está entre os valores informados de min e max (inclusive).
     """
     logger.info(f"GET /api/v1/books/price-range chamado por IP: {request.client.host if request else 'indefinido'}")
-    livros = carregar_livros()
-    resultado = []
-    
-    for livro in livros:
-        preco = processar_preco_csv(livro.get("Preço", "0"))  # ← APENAS ESTA LINHA!
-        if min <= preco <= max:
-            resultado.append(livro)
-    
+    resultado = catalogo.livros_por_faixa_de_preco(min, max)
     if not resultado:
         raise HTTPException(status_code=404, detail="Nenhum livro encontrado nesta faixa de preço.")
     return resultado
@@ -424,13 +352,13 @@ def livros_por_faixa_de_preco(
         "Retorna uma lista de dicionários contendo apenas os campos relevantes para uso como features em modelos de Machine Learning. "
     )
 )
-def ml_features(request: Request):
+def ml_features(request: Request, catalogo: BackendLivros = Depends(sessao_catalogo)):
     """
     Prepara os dados do catálogo de livros para uso direto em modelos de ML.
     Mantém apenas os principais atributos (título, categoria, preço, rating, disponibilidade).
     """
     logger.info(f"GET /api/v1/ml/features chamado por IP: {request.client.host}")
-    livros = carregar_livros()
+    livros = catalogo.carregar_livros()
     features = []
 
     for livro in livros:
@@ -450,13 +378,13 @@ def ml_features(request: Request):
         "Retorna o dataset completo de livros extraído do arquivo CSV original. "
     )
 )
-def ml_training_data(request: Request):
+def ml_training_data(request: Request, catalogo: BackendLivros = Depends(sessao_catalogo)):
     """
     Endpoint para acessar o conjunto de dados bruto, pronto para treino/teste em projetos de Machine Learning.
     Não realiza limpeza ou engenharia de features; é útil como base para extração manual ou automática.
     """
     logger.info(f"GET /api/v1/ml/training-data chamado por IP: {request.client.host}")
-    livros = carregar_livros()
+    livros = catalogo.carregar_livros()
     return livros
 
 @app.post(
@@ -0,0 +1,88 @@
+"""
+Gera um catálogo sintético de livros no mesmo formato do scraper_books.py,
+para medir como a API se comporta com bases muito maiores.
+Gera um CSV com campos: Título, Categoria, Preço, Rating, Disponibilidade, Imagem
+
+Como executar:
+python scripts/gerar_catalogo_sintetico.py --quantidade 1000000 --saida data/livros_sinteticos.csv
+
+Para servir o catálogo gerado pela API com SQLite:
+python api/armazenamento.py data/livros_sinteticos.csv data/livros_sinteticos.db
+BOOKS_BACKEND=sqlite BOOKS_DB_PATH=data/livros_sinteticos.db uvicorn main:app
+"""
+
+import argparse
+import csv
+import os
+import random
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '../data')
+CSV_BASE = os.path.join(DATA_DIR, 'livros_completo.csv')
+CSV_SAIDA = os.path.join(DATA_DIR, 'livros_sinteticos.csv')
+
+CAMPOS = ['Título', 'Categoria', 'Preço', 'Rating', 'Disponibilidade', 'Imagem']
+RATINGS = ['One', 'Two', 'Three', 'Four', 'Five']
+PALAVRAS_PADRAO = [
+    'The', 'Secret', 'Life', 'of', 'Night', 'House', 'Story', 'Last', 'Girl',
+    'World', 'Love', 'Dark', 'City', 'Book', 'History', 'Light', 'Garden'
+]
+CATEGORIAS_PADRAO = ['Fiction', 'Poetry', 'History', 'Mystery', 'Romance', 'Science']
+
+
+def carregar_base(caminho_csv):
+    """
+    Lê o CSV real (se existir) para copiar vocabulário e distribuição de categorias.
+    """
+    palavras, categorias = [], []
+    if not os.path.exists(caminho_csv):
+        return PALAVRAS_PADRAO, CATEGORIAS_PADRAO
+    with open(caminho_csv, encoding='utf-8-sig') as f:
+        for row in csv.DictReader(f, delimiter=';'):
+            row = {k.strip(): v for k, v in row.items()}
+            palavras.extend(w for w in (row.get('Título') or '').split() if w.isalpha())
+            if row.get('Categoria'):
+                categorias.append(row['Categoria'].strip())
+    return palavras or PALAVRAS_PADRAO, categorias or CATEGORIAS_PADRAO
+
+
+def gerar_livros(quantidade, palavras, categorias, rng):
+    """
+    Gera os livros um a um, no esquema do scraper.
+    Categorias seguem a frequência do CSV real; preços entre 10 e 60 libras.
+    """
+    for i in range(quantidade):
+        titulo = ' '.join(rng.choice(palavras) for _ in range(rng.randint(1, 6)))
+        hash_imagem = f'{rng.getrandbits(128):032x}'
+        yield {
+            'Título': f'{titulo} {i + 1}',
+            'Categoria': rng.choice(categorias),
+            'Preço': f'{rng.uniform(10, 60):.2f}',
+            'Rating': rng.choice(RATINGS),
+            'Disponibilidade': 'In stock',
+            'Imagem': f'https://books.toscrape.com/media/cache/{hash_imagem[:2]}/{hash_imagem[2:4]}/{hash_imagem}.jpg',
+        }
+
+
+def salvar_csv(livros, caminho_csv):
+    """
+    Salva os livros gerados em CSV, no mesmo formato do scraper_books.py.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(caminho_csv)), exist_ok=True)
+    with open(caminho_csv, mode='w', newline='', encoding='utf-8') as arquivo:
+        escritor = csv.DictWriter(arquivo, fieldnames=CAMPOS, delimiter=';')
+        escritor.writeheader()
+        escritor.writerows(livros)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera catálogo sintético de livros")
+    parser.add_argument('--quantidade', type=int, default=100000, help="Número de livros a gerar")
+    parser.add_argument('--saida', default=CSV_SAIDA, help="Caminho do CSV gerado")
+    parser.add_argument('--base', default=CSV_BASE, help="CSV real usado como referência")
+    parser.add_argument('--seed', type=int, default=42, help="Semente para resultados reprodutíveis")
+    args = parser.parse_args()
+
+    palavras, categorias = carregar_base(args.base)
+    rng = random.Random(args.seed)
+    salvar_csv(gerar_livros(args.quantidade, palavras, categorias, rng), args.saida)
+    print(f"Catálogo sintético gerado: {args.quantidade} livros salvos em {args.saida}")
@@ -0,0 +1,166 @@
+"""
+Testes dos backends de armazenamento (api/armazenamento.py).
+
+Como executar:
+python -m pytest tests
+"""
+
+import csv
+import os
+import sqlite3
+import threading
+
+import pytest
+
+from api.armazenamento import (
+    BackendCSV,
+    BackendLivros,
+    BackendSQLite,
+    PoolConexoes,
+    PoolEsgotado,
+    atualizar_banco_sqlite,
+)
+
+LIVROS = [
+    ['A Light in the Attic', 'Poetry', ' £51,77 ', 'Three', 'In stock', 'a.jpg'],
+    ['Élan Vital', 'Ficção', ' £10,00 ', 'Five', 'In stock', 'b.jpg'],
+    ['Ça', 'ficção', ' £20,50 ', 'One', 'In stock', 'c.jpg'],
+    ['Straße Über Alles', 'Travel', ' £15,00 ', 'Two', 'In stock', 'd.jpg'],
+    ['Sem Preço', 'Poetry', '', 'Five', 'In stock', 'e.jpg'],
+    ['Sem Rating', 'Poetry', ' £30,00 ', '', 'In stock', 'f.jpg'],
+    ['O "Livro" das Aspas', 'Travel', ' £60,00 ', 'Four', 'In stock', 'g.jpg'],
+]
+
+
+def escrever_csv(caminho, livros):
+    with open(caminho, mode='w', newline='', encoding='utf-8-sig') as f:
+        escritor = csv.writer(f, delimiter=';')
+        escritor.writerow(['Título', 'Categoria', ' Preço ', 'Rating', 'Disponibilidade', 'Imagem'])
+        escritor.writerows(livros)
+
+
+@pytest.fixture
+def caminho_csv(tmp_path):
+    caminho = str(tmp_path / 'livros.csv')
+    escrever_csv(caminho, LIVROS)
+    return caminho
+
+
+@pytest.fixture
+def backends(tmp_path, caminho_csv):
+    sqlite = BackendSQLite(str(tmp_path / 'livros.db'), caminho_csv)
+    with sqlite.sessao() as consultas:
+        yield BackendCSV(caminho_csv), consultas
+    sqlite.fechar()
+
+
+@pytest.mark.parametrize('metodo, args', [
+    ('carregar_livros', ()),
+    ('obter_livro', (0,)),
+    ('obter_livro', (6,)),
+    ('obter_livro', (7,)),
+    ('obter_livro', (-1,)),
+    ('contar_livros', ()),
+    ('listar_categorias', ()),
+    ('buscar_livros', (None, None)),
+    ('buscar_livros', ('é', None)),
+    ('buscar_livros', ('ÉL', None)),
+    ('buscar_livros', ('ça', None)),
+    ('buscar_livros', ('ç', None)),
+    ('buscar_livros', ('  ÉLAN VI ', None)),
+    ('buscar_livros', ('straße', None)),
+    ('buscar_livros', ('li', None)),
+    ('buscar_livros', ('light', None)),
+    ('buscar_livros', ('"livro"', None)),
+    ('buscar_livros', ('inexistente', None)),
+    ('buscar_livros', (None, 'FICÇÃO')),
+    ('buscar_livros', (None, ' ficção ')),
+    ('buscar_livros', ('ü', 'travel')),
+    ('buscar_livros', ('sem', 'POETRY')),
+    ('livros_por_faixa_de_preco', (0, 0)),
+    ('livros_por_faixa_de_preco', (10, 20.5)),
+    ('livros_por_faixa_de_preco', (0, 100)),
+    ('livros_top_rated', ()),
+    ('estatisticas_gerais', ()),
+    ('estatisticas_categorias', ()),
+])
+def test_sqlite_igual_ao_csv(backends, metodo, args):
+    backend_csv, consultas_sqlite = backends
+    assert getattr(consultas_sqlite, metodo)(*args) == getattr(backend_csv, metodo)(*args)
+
+
+def test_backend_livros_e_abstrato():
+    with pytest.raises(TypeError):
+        BackendLivros()
+
+
+def test_pool_esgotado(tmp_path, caminho_csv):
+    caminho_db = str(tmp_path / 'livros.db')
+    atualizar_banco_sqlite(caminho_db, caminho_csv)
+    pool = PoolConexoes(caminho_db, tamanho=1, timeout=0.1)
+    with pool.conexao():
+        with pytest.raises(PoolEsgotado):
+            with pool.conexao():
+                pass
+    with pool.conexao() as con:
+        assert con.execute("SELECT COUNT(*) FROM livros").fetchone()[0] == len(LIVROS)
+    pool.fechar()
+
+
+def test_pool_libera_vaga_quando_conexao_falha(tmp_path):
+    pool = PoolConexoes(str(tmp_path / 'nao_existe' / 'livros.db'), tamanho=1, timeout=0.1)
+    for _ in range(3):
+        with pytest.raises(sqlite3.OperationalError):
+            with pool.conexao():
+                pass
+    assert pool._criadas == 0
+
+
+def test_pool_fechado_fecha_conexoes_devolvidas(tmp_path, caminho_csv):
+    caminho_db = str(tmp_path / 'livros.db')
+    atualizar_banco_sqlite(caminho_db, caminho_csv)
+    pool = PoolConexoes(caminho_db, tamanho=2)
+    with pool.conexao() as con:
+        pool.fechar()
+    assert pool._criadas == 0
+    with pytest.raises(sqlite3.ProgrammingError):
+        con.execute("SELECT 1")
+
+
+def test_reconstroi_quando_csv_muda(tmp_path, caminho_csv):
+    caminho_db = str(tmp_path / 'livros.db')
+    atualizar_banco_sqlite(caminho_db, caminho_csv)
+    gerado_em = os.stat(caminho_db).st_mtime_ns
+
+    atualizar_banco_sqlite(caminho_db, caminho_csv)
+    assert os.stat(caminho_db).st_mtime_ns == gerado_em
+
+    escrever_csv(caminho_csv, LIVROS + [['Novo', 'Poetry', ' £1,00 ', 'One', 'In stock', 'h.jpg']])
+    backend = BackendSQLite(caminho_db, caminho_csv)
+    with backend.sessao() as consultas:
+        assert consultas.contar_livros() == len(LIVROS) + 1
+    backend.fechar()
+
+
+def test_construcao_concorrente(tmp_path, caminho_csv):
+    caminho_db = str(tmp_path / 'livros.db')
+    erros = []
+
+    def construir():
+        try:
+            atualizar_banco_sqlite(caminho_db, caminho_csv)
+        except Exception as e:
+            erros.append(e)
+
+    threads = [threading.Thread(target=construir) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert erros == []
+    assert not [n for n in os.listdir(tmp_path) if n.endswith('.tmp')]
+    backend = BackendSQLite(caminho_db, caminho_csv)
+    with backend.sessao() as consultas:
+        assert consultas.contar_livros() == len(LIVROS)
+    backend.fechar()